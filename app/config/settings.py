@@ -7,6 +7,7 @@ import logging
 class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./quality_control.db")
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    SAVE_UPLOADED_IMAGES = os.getenv("SAVE_UPLOADED_IMAGES", "true").lower() == "true"
 
 settings = Settings()
 
@@ -232,7 +233,7 @@ if __name__ == "__main__":
     try:
         validated_data = validate_user_data(user_data)
         print("User data is valid:", validated_data)
-        response = api_client.post("users", data=validated_data.dict())
+        response = api_client.post("users", data=validated_data.model_dump())
         print("API response:", response)
 
         # Save API response to a file
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, UploadFile, HTTPException
-from models.defect_detection import DefectDetectionModel
-from services.data_service import preprocess_image
+from models.singletons import get_defect_model
+from services.data_science import preprocess_image
 import logging
+import orjson
 from typing import List
 import shutil
 import os
 
 router = APIRouter()
-model = DefectDetectionModel()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -65,8 +65,9 @@ def log_analytics(file_name: str, prediction: bool):
                 msg="", args=(), exc_info=None
             ))
         }
-        with open("analytics.log", "a") as analytics_file:
-            analytics_file.write(f"{analytics_data}\n")
+        # One JSON line per entry, encoded straight to bytes
+        with open("analytics.log", "ab") as analytics_file:
+            analytics_file.write(orjson.dumps(analytics_data) + b"\n")
         logger.info(f"Analytics logged for {file_name}")
     except Exception as e:
         logger.error(f"Failed to log analytics: {e}")
@@ -112,7 +113,7 @@ def process_batch_files(files: List[UploadFile]):
 
             file_path = save_uploaded_file(file)
             image_tensor = preprocess_image(file.file.read())
-            prediction = model.predict(image_tensor)
+            prediction = get_defect_model().predict(image_tensor)
             result = bool(prediction)
 
             log_prediction(file.filename, result)
@@ -223,7 +224,7 @@ async def detect_defect(file: UploadFile):
 
         # Preprocess and predict
         image_tensor = preprocess_image(await file.read())
-        prediction = model.predict(image_tensor)
+        prediction = get_defect_model().predict(image_tensor)
         result = bool(prediction)
 
         # Log the prediction
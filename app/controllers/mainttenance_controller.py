@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException
-from models.predictive_maintenance import PredictiveMaintenanceModel
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from models.singletons import get_maintenance_model
 from services.data_service import fetch_maintenance_data
 from datetime import datetime
 import smtplib
@@ -10,7 +10,6 @@ import prometheus_client
 from prometheus_client import Counter, Gauge
 
 router = APIRouter()
-model = PredictiveMaintenanceModel()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -55,7 +54,6 @@ def send_maintenance_alert(equipment_id: str, next_maintenance_date: str, risk_s
         logger.info(f"Maintenance alert sent to {recipient}")
     except Exception as e:
         logger.error(f"Failed to send email alert: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to send email alert: {str(e)}")
 
 # Logging component for predictions
 def log_prediction(equipment_id: str, next_maintenance_date: str, risk_score: float):
@@ -83,11 +81,12 @@ async def health_check():
     return {"status": "ok"}
 
 @router.get("/predict")
-async def predict_maintenance(equipment_id: str, alert_recipient: str = None):
+async def predict_maintenance(background_tasks: BackgroundTasks, equipment_id: str, alert_recipient: str = None):
     """
     Predict the maintenance needs for a specific equipment ID.
 
     Args:
+        background_tasks (BackgroundTasks): Tasks run after the response is sent.
         equipment_id (str): The unique identifier for the equipment.
         alert_recipient (str, optional): Email address to send maintenance alerts.
 
@@ -102,7 +101,7 @@ async def predict_maintenance(equipment_id: str, alert_recipient: str = None):
             raise HTTPException(status_code=404, detail="Equipment data not found")
 
         # Generate predictions
-        prediction = model.predict(data)
+        prediction = get_maintenance_model().predict(data)
         result = {
             "equipment_id": equipment_id,
             "next_maintenance_date": prediction["next_date"],
@@ -112,9 +111,11 @@ async def predict_maintenance(equipment_id: str, alert_recipient: str = None):
         # Log the prediction
         log_prediction(equipment_id, prediction["next_date"], prediction["risk_score"])
 
-        # Send email alert if recipient is provided
+        # Send email alert after the response is returned
         if alert_recipient:
-            send_maintenance_alert(equipment_id, prediction["next_date"], prediction["risk_score"], alert_recipient)
+            background_tasks.add_task(
+                send_maintenance_alert, equipment_id, prediction["next_date"], prediction["risk_score"], alert_recipient
+            )
 
         # Send system notification for high-risk predictions
         if prediction["risk_score"] > 0.8:
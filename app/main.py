@@ -1,5 +1,10 @@
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 from routes import defect_routes, maintenance_routes, quality_routes
+from services import compliance_service
+from services.quality_service import QualityService
+from services.data_science import defect_batcher
+from models.singletons import get_defect_model, get_maintenance_model
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from datetime import datetime
@@ -8,7 +13,34 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI-Powered Quality Control", version="1.0.0")
+# Load the predictive maintenance model up front so `gunicorn --preload` workers share its
+# memory-mapped tree arrays copy-on-write. Only CPU-side state may be loaded here: CUDA
+# cannot be re-initialized in a forked child and threads do not survive the fork, so the
+# defect model, the services and their background threads are created in the lifespan,
+# which runs in every worker after the fork.
+get_maintenance_model()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create services and background workers once at startup instead of at module import.
+    """
+    app.state.compliance = await compliance_service.ComplianceService.create()
+    app.state.quality = QualityService()
+    compliance_service.start_audit_writer()
+    # Loads the defect model (onto the GPU, if any) in this worker
+    defect_batcher.start(get_defect_model().predict_batch)
+    yield
+    await defect_batcher.stop()
+    await compliance_service.stop_audit_writer()
+    await app.state.compliance.close()
+    app.state.quality.close()
+
+app = FastAPI(
+    title="AI-Powered Quality Control",
+    version="1.0.0",
+    lifespan=lifespan,
+)
 
 # Enable CORS
 app.add_middleware(
@@ -23,6 +55,7 @@ app.add_middleware(
 app.include_router(defect_routes.router, prefix="/defects")
 app.include_router(maintenance_routes.router, prefix="/maintenance")
 app.include_router(quality_routes.router, prefix="/quality")
+app.include_router(compliance_service.router, prefix="/quality")
 
 # Request Logging Middleware
 @app.middleware("http")
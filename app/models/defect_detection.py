@@ -8,20 +8,67 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ImageNet statistics the pretrained backbone expects, shared by inference and augmentation
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+
 class DefectDetectionModel:
     def __init__(self):
         self.model = models.resnet18(pretrained=True)  # Pretrained ResNet
         self.model.fc = torch.nn.Linear(self.model.fc.in_features, 2)  # Binary classification
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
+        # ImageNet normalization folded into one scale and shift, kept on the device:
+        # (x / 255 - mean) / std == x * scale - shift
+        mean = torch.tensor(IMAGENET_MEAN, device=self.device).view(1, 3, 1, 1)
+        std = torch.tensor(IMAGENET_STD, device=self.device).view(1, 3, 1, 1)
+        self.input_scale = 1.0 / (255.0 * std)
+        self.input_shift = mean / std
+
+    def to_model_input(self, images):
+        """
+        Move uint8 images to the device and normalize them there.
+
+        Sending uint8 instead of float32 cuts the host-to-device copy to a quarter.
+
+        Args:
+            images (torch.Tensor): uint8 images of shape (N, 3, 224, 224).
+
+        Returns:
+            torch.Tensor: Normalized float32 images on the model's device.
+
+        Raises:
+            TypeError: If the images are not uint8, e.g. already normalized floats,
+                which would otherwise be normalized a second time.
+        """
+        if images.dtype != torch.uint8:
+            raise TypeError(f"Expected uint8 images from preprocess_image, got {images.dtype}")
+        # Asynchronous when the images live in pinned memory
+        images = images.to(self.device, non_blocking=True)
+        return images.float().mul_(self.input_scale).sub_(self.input_shift)
 
     def predict(self, image_tensor):
         self.model.eval()
         with torch.no_grad():
-            image_tensor = image_tensor.to(self.device)
-            output = self.model(image_tensor)
+            output = self.model(self.to_model_input(image_tensor))
         return torch.argmax(output, dim=1).item()
 
+    def predict_batch(self, image_tensors):
+        """
+        Run one forward pass over a stacked batch of images.
+
+        Args:
+            image_tensors (torch.Tensor): uint8 images of shape (N, 3, 224, 224).
+
+        Returns:
+            list: Predicted class for each image.
+        """
+        self.model.eval()
+        with torch.no_grad():
+            # tolist() below synchronizes, so the input buffer is free once this returns
+            output = self.model(self.to_model_input(image_tensors))
+        return torch.argmax(output, dim=1).tolist()
+
     def save_model(self, path: str):
         """
         Save the model to a specified path.
@@ -56,7 +103,7 @@ class DataAugmentation:
             transforms.RandomRotation(10),
             transforms.ColorJitter(brightness=0.2, contrast=0.2, saturation=0.2),
             transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+            transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
         ])
 
     def apply(self, image):
@@ -2,30 +2,278 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from datetime import datetime, timedelta
+from typing import Optional
+import hashlib
 import pickle
 import matplotlib.pyplot as plt
 import logging
+import os
+
+try:
+    import numba
+except ImportError:  # no numba wheel for this platform; ForestArrays falls back to numpy traversal
+    numba = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_PATH = "models/maintenance_model.pkl"
+TREE_ARRAYS_DIR = "models/maintenance_trees"
+
+def _file_digest(path: str) -> str:
+    """
+    Return the hex BLAKE2b digest of a file's contents.
+    """
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Compiled Tree Traversal Component
+#
+# Compiled without parallel=True: predictions run on FastAPI's threadpool, and numba's
+# parallel runtime called from non-main threads can hang interpreter exit (TBB) or abort
+# on concurrent calls (workqueue). Requests already run side by side on that pool.
+if numba is not None:
+    @numba.njit(cache=True)
+    def _walk_forest(feature, threshold, children_left, children_right, value, X):
+        """
+        Return the (n_trees, n_samples) leaf values reached by each sample, following
+        the left or right child at every split until a leaf is reached.
+        """
+        n_trees = feature.shape[0]
+        n_samples = X.shape[0]
+        out = np.empty((n_trees, n_samples), dtype=np.float64)
+        for t in range(n_trees):
+            for i in range(n_samples):
+                node = 0
+                while feature[t, node] >= 0:
+                    go_left = X[i, feature[t, node]] <= threshold[t, node]
+                    node = children_left[t, node] if go_left else children_right[t, node]
+                out[t, i] = value[t, node]
+        return out
+else:
+    _walk_forest = None
+
+# Tree Array Component
+class ForestArrays:
+    """
+    Flat array layout of a fitted random forest regressor.
+
+    Every field is a (n_trees, max_nodes) array padded to the largest tree; leaf
+    nodes have feature == -1. The arrays are stored as one .npy file per field so
+    each worker can np.load them with mmap_mode="r" and share the page cache
+    instead of unpickling its own copy of the forest. SOURCE_FILE records the digest
+    of the pickled model the arrays were exported from.
+    """
+    FIELDS = ("feature", "threshold", "children_left", "children_right", "value")
+    SOURCE_FILE = "source.digest"
+
+    def __init__(self, feature, threshold, children_left, children_right, value):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+
+    @classmethod
+    def from_estimator(cls, forest: RandomForestRegressor):
+        """
+        Build the flat arrays from a fitted scikit-learn forest.
+
+        Args:
+            forest (RandomForestRegressor): Fitted forest to export.
+
+        Returns:
+            ForestArrays: Array representation of the forest.
+        """
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        n_trees = len(trees)
+        max_nodes = max(tree.node_count for tree in trees)
+
+        feature = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        threshold = np.zeros((n_trees, max_nodes), dtype=np.float64)
+        children_left = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        children_right = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        value = np.zeros((n_trees, max_nodes), dtype=np.float64)
+        for t, tree in enumerate(trees):
+            n = tree.node_count
+            is_split = tree.children_left[:n] >= 0
+            feature[t, :n] = np.where(is_split, tree.feature[:n], -1)
+            threshold[t, :n] = tree.threshold[:n]
+            children_left[t, :n] = tree.children_left[:n]
+            children_right[t, :n] = tree.children_right[:n]
+            value[t, :n] = tree.value[:n, 0, 0]
+        return cls(feature, threshold, children_left, children_right, value)
+
+    def save(self, directory: str, source_digest: Optional[str] = None):
+        """
+        Save each field as an uncompressed .npy file so it can be memory-mapped.
+
+        Every file is written to a temporary name and renamed into place, and the source
+        digest goes last, so workers exporting at the same time never read a partial file
+        and a matching digest always means the arrays next to it are complete.
+
+        Args:
+            directory (str): Directory to write the arrays to.
+            source_digest (str, optional): Digest of the pickled model the arrays came from.
+        """
+        os.makedirs(directory, exist_ok=True)
+        source_path = os.path.join(directory, self.SOURCE_FILE)
+        if os.path.exists(source_path):
+            os.remove(source_path)
+        for field in self.FIELDS:
+            path = os.path.join(directory, f"{field}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                np.save(file, getattr(self, field))
+            os.replace(tmp_path, path)
+        if source_digest is not None:
+            tmp_path = f"{source_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file:
+                file.write(source_digest)
+            os.replace(tmp_path, source_path)
+        logger.info(f"Forest arrays saved to {directory}")
+
+    @classmethod
+    def saved_source(cls, directory: str) -> Optional[str]:
+        """
+        Return the digest of the pickled model the saved arrays were exported from.
+
+        Args:
+            directory (str): Directory containing the saved arrays.
+
+        Returns:
+            str: The recorded digest, or None if none was recorded.
+        """
+        try:
+            with open(os.path.join(directory, cls.SOURCE_FILE)) as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def load(cls, directory: str):
+        """
+        Memory-map previously saved forest arrays read-only.
+
+        Args:
+            directory (str): Directory containing the saved arrays.
+
+        Returns:
+            ForestArrays: Array representation of the forest.
+        """
+        arrays = {
+            field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+            for field in cls.FIELDS
+        }
+        logger.info(f"Forest arrays memory-mapped from {directory}")
+        return cls(**arrays)
+
+    def predict(self, data: np.ndarray) -> np.ndarray:
+        """
+        Average the leaf values reached by each sample across all trees.
+
+        Uses the compiled numba kernel when numba is installed, otherwise a
+        vectorized numpy traversal over all trees at once.
+
+        Args:
+            data (np.ndarray): Feature data of shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: Predicted values of shape (n_samples,).
+        """
+        X = np.asarray(data, dtype=np.float32)
+        if _walk_forest is not None:
+            return _walk_forest(
+                self.feature, self.threshold, self.children_left, self.children_right, self.value, X
+            ).mean(axis=0)
+
+        tree_idx = np.arange(self.feature.shape[0])[:, None]
+        sample_idx = np.arange(X.shape[0])[None, :]
+        nodes = np.zeros((tree_idx.shape[0], X.shape[0]), dtype=np.intp)
+        while True:
+            feature = self.feature[tree_idx, nodes]
+            active = feature >= 0
+            if not active.any():
+                break
+            go_left = X[sample_idx, np.where(active, feature, 0)] <= self.threshold[tree_idx, nodes]
+            next_nodes = np.where(go_left, self.children_left[tree_idx, nodes], self.children_right[tree_idx, nodes])
+            nodes = np.where(active, next_nodes, nodes)
+        return self.value[tree_idx, nodes].mean(axis=0)
+
 class PredictiveMaintenanceModel:
     """
     Predictive maintenance model using a Random Forest Regressor.
     Predicts the number of days until maintenance is required and the associated risk score.
+
+    Predictions walk tree arrays memory-mapped from TREE_ARRAYS_DIR, and the pickled
+    scikit-learn model is only loaded on demand (training, evaluation, feature
+    importance). The arrays are exported from MODEL_PATH on first start, and again
+    whenever the pickle's digest no longer matches the one recorded with them.
     """
 
     def __init__(self):
+        self._model = None
+        self.trees = self._load_tree_arrays()
+        if self.trees is None:
+            self._load_model()
+
+    def _load_tree_arrays(self) -> Optional[ForestArrays]:
+        """
+        Memory-map the exported tree arrays, exporting them first if they are missing
+        or were exported from a different pickle than the one at MODEL_PATH.
+
+        Returns:
+            ForestArrays: The memory-mapped arrays, or None to predict with the pickle.
+        """
+        source_digest = _file_digest(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+        try:
+            if os.path.isdir(TREE_ARRAYS_DIR):
+                if source_digest is None or ForestArrays.saved_source(TREE_ARRAYS_DIR) == source_digest:
+                    return ForestArrays.load(TREE_ARRAYS_DIR)
+                logger.info("Forest arrays are stale, re-exporting them from the pickled model.")
+            if source_digest is None:
+                return None
+            self.export_tree_arrays(source_digest=source_digest)
+            # Predictions use the memory-mapped arrays; the pickle is reloaded on demand
+            self._model = None
+            return ForestArrays.load(TREE_ARRAYS_DIR)
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Failed to load forest arrays, falling back to the pickled model: {e}")
+            return None
+
+    def _load_model(self):
         # Initialize or load the pre-trained Random Forest model
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self._model = RandomForestRegressor(n_estimators=100, random_state=42)
         try:
-            with open("models/maintenance_model.pkl", "rb") as f:
-                self.model = pickle.load(f)
+            with open(MODEL_PATH, "rb") as f:
+                self._model = pickle.load(f)
             logger.info("Pre-trained model loaded successfully.")
         except FileNotFoundError:
             logger.warning("Pre-trained model not found. Using an untrained model.")
 
+    @property
+    def model(self) -> RandomForestRegressor:
+        if self._model is None:
+            self._load_model()
+        return self._model
+
+    def export_tree_arrays(self, directory: str = TREE_ARRAYS_DIR, source_digest: Optional[str] = None):
+        """
+        Export the fitted forest to flat arrays that workers can memory-map.
+
+        Args:
+            directory (str): Directory to write the arrays to.
+            source_digest (str, optional): Digest of MODEL_PATH; computed if not given.
+        """
+        if source_digest is None and os.path.exists(MODEL_PATH):
+            source_digest = _file_digest(MODEL_PATH)
+        self.trees = ForestArrays.from_estimator(self.model)
+        self.trees.save(directory, source_digest)
+
     def train(self, X_train: np.ndarray, y_train: np.ndarray):
         """
         Train the predictive maintenance model.
@@ -35,8 +283,9 @@ class PredictiveMaintenanceModel:
             y_train (np.ndarray): Training labels (days to maintenance).
         """
         self.model.fit(X_train, y_train)
-        with open("models/maintenance_model.pkl", "wb") as f:
+        with open(MODEL_PATH, "wb") as f:
             pickle.dump(self.model, f)
+        self.export_tree_arrays()
         logger.info("Model trained and saved successfully.")
 
     def predict(self, data: np.ndarray):
@@ -49,20 +298,40 @@ class PredictiveMaintenanceModel:
         Returns:
             dict: Predicted next maintenance date and risk score.
         """
-        # Predict days to maintenance
-        days_to_maintenance = self.model.predict(data)[0]
+        prediction = self.predict_batch(data)[0]
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Prediction made: Next maintenance on %s, Risk Score: %.2f", prediction["next_date"], prediction["risk_score"])
+        return prediction
 
-        # Calculate risk score (arbitrary example: higher days = lower risk)
-        risk_score = max(0, 100 - days_to_maintenance * 10)
+    def predict_batch(self, data: np.ndarray):
+        """
+        Predict maintenance needs for every row of the input in a single model call.
 
-        # Determine next maintenance date
-        next_date = datetime.now() + timedelta(days=int(days_to_maintenance))
+        Args:
+            data (np.ndarray): Feature data of shape (n_samples, n_features).
 
-        logger.info(f"Prediction made: Next maintenance on {next_date.strftime('%Y-%m-%d')}, Risk Score: {risk_score:.2f}")
-        return {
-            "next_date": next_date.strftime("%Y-%m-%d"),
-            "risk_score": round(risk_score, 2)
-        }
+        Returns:
+            list: Predicted next maintenance date and risk score for each row.
+        """
+        # Predict days to maintenance
+        if self.trees is not None:
+            days = self.trees.predict(data)
+        else:
+            days = self.model.predict(data)
+
+        now = datetime.now()
+        predictions = []
+        for days_to_maintenance in days:
+            # Calculate risk score (arbitrary example: higher days = lower risk)
+            risk_score = max(0, 100 - days_to_maintenance * 10)
+
+            # Determine next maintenance date
+            next_date = (now + timedelta(days=int(days_to_maintenance))).strftime("%Y-%m-%d")
+            predictions.append({
+                "next_date": next_date,
+                "risk_score": round(float(risk_score), 2)
+            })
+        return predictions
 
     def evaluate(self, X_test: np.ndarray, y_test: np.ndarray):
         """
@@ -0,0 +1,27 @@
+from functools import lru_cache
+from models.defect_detection import DefectDetectionModel
+from models.predictive_maintenance import PredictiveMaintenanceModel
+
+# Shared model instances.
+#
+# Every route and controller module gets its model through these getters, so each
+# process holds a single copy of each model no matter how many routers use it.
+# app/main.py loads the maintenance model at import time; running under
+# `gunicorn --preload -w N` therefore memory-maps its tree arrays once in the master, and
+# the forked workers share those read-only pages copy-on-write. The defect model must not
+# be loaded before the fork: it moves to CUDA when available, and CUDA cannot be
+# re-initialized in a forked child. It is loaded by the lifespan in each worker instead.
+
+@lru_cache(maxsize=1)
+def get_defect_model() -> DefectDetectionModel:
+    """
+    Return the process-wide defect detection model, loading it on first use.
+    """
+    return DefectDetectionModel()
+
+@lru_cache(maxsize=1)
+def get_maintenance_model() -> PredictiveMaintenanceModel:
+    """
+    Return the process-wide predictive maintenance model, loading it on first use.
+    """
+    return PredictiveMaintenanceModel()
@@ -1,18 +1,30 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from models.defect_detection import DefectDetectionModel
-from services.data_service import preprocess_image
+from services.data_science import preprocess_image_async, preprocess_batch_async, defect_batcher
+from models.singletons import get_defect_model
 from config.logging import get_logger
-from typing import List
+from config.settings import settings
+from pydantic import BaseModel
+from typing import List, Optional
 import pandas as pd
+import asyncio
 import os
-import shutil
 
 # Logger for this module
 logger = get_logger(__name__)
 
-# Initialize router and model
+# Initialize router
 router = APIRouter()
-model = DefectDetectionModel()
+
+# Response models; FastAPI serializes these straight to JSON bytes in pydantic-core
+class DefectResult(BaseModel):
+    filename: Optional[str] = None
+    defect_detected: bool
+    confidence: int
+
+class DefectBatchResult(BaseModel):
+    total_files: int
+    defects_detected: int
+    results: List[DefectResult]
 
 # Result storage component
 def save_results_to_csv(results: List[dict], output_path: str = "results/defect_detection_results.csv"):
@@ -29,21 +41,38 @@ def save_results_to_csv(results: List[dict], output_path: str = "results/defect_
     logger.info(f"Results saved to {output_path}")
 
 # Image storage component
-def save_uploaded_images(files: List[UploadFile], directory: str = "uploads"):
+def _write_image(file_path: str, data: bytes):
+    """
+    Write image bytes to disk in a single unbuffered write.
+    """
+    with open(file_path, "wb", buffering=0) as buffer:
+        buffer.write(data)
+
+async def save_uploaded_images(files: List[UploadFile], directory: str = "uploads"):
     """
     Save uploaded images to a specified directory.
 
+    Each upload is read in one call and written from the default thread pool,
+    so the disk writes for a batch overlap instead of running back to back.
+
     Args:
         files (List[UploadFile]): List of uploaded image files.
         directory (str): Directory to save the images.
     """
+    if not settings.SAVE_UPLOADED_IMAGES:
+        return
     os.makedirs(directory, exist_ok=True)
-    for file in files:
+    loop = asyncio.get_running_loop()
+
+    async def _save(file: UploadFile):
+        await file.seek(0)
+        data = await file.read()
         file_path = os.path.join(directory, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await loop.run_in_executor(None, _write_image, file_path, data)
         logger.info(f"Image saved to {file_path}")
 
+    await asyncio.gather(*(_save(file) for file in files))
+
 # Notification component
 def send_notification(message: str):
     """
@@ -54,7 +83,7 @@ def send_notification(message: str):
     """
     logger.info(f"Notification: {message}")
 
-@router.post("/detect", summary="Detect defects in an uploaded image")
+@router.post("/detect", response_model=DefectResult, summary="Detect defects in an uploaded image")
 async def detect_defect(file: UploadFile = File(...)):
     """
     Detect defects in the uploaded image.
@@ -69,11 +98,11 @@ async def detect_defect(file: UploadFile = File(...)):
         # Log the file received
         logger.info(f"Received file for defect detection: {file.filename}")
 
-        # Preprocess image
-        image_tensor = preprocess_image(await file.read())
+        # Preprocess image off the event loop
+        image_tensor = await preprocess_image_async(await file.read())
 
-        # Make prediction
-        defect_detected = model.predict(image_tensor)
+        # Make prediction; concurrent requests are batched into one forward pass
+        defect_detected = await defect_batcher.infer(image_tensor)
 
         result = {
             "filename": file.filename,
@@ -88,7 +117,7 @@ async def detect_defect(file: UploadFile = File(...)):
         logger.error(f"Error during defect detection: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error processing the image for defect detection.")
 
-@router.post("/detect-batch", summary="Detect defects in a batch of uploaded images")
+@router.post("/detect-batch", response_model=DefectBatchResult, summary="Detect defects in a batch of uploaded images")
 async def detect_defect_batch(files: List[UploadFile] = File(...)):
     """
     Detect defects in a batch of uploaded images.
@@ -100,36 +129,41 @@ async def detect_defect_batch(files: List[UploadFile] = File(...)):
         dict: Summary of batch defect detection results.
     """
     try:
-        results = []
+        image_datas = []
         for file in files:
             # Log the file received
             logger.info(f"Processing file for defect detection: {file.filename}")
+            image_datas.append(await file.read())
 
-            # Preprocess image
-            image_tensor = preprocess_image(await file.read())
+        # Preprocess images concurrently on the preprocessing pool into one pinned batch
+        batch = await preprocess_batch_async(image_datas)
 
-            # Make prediction
-            defect_detected = model.predict(image_tensor)
+        # The request is already a batch, so run it as one forward pass instead of via the batcher
+        predictions = await asyncio.get_running_loop().run_in_executor(None, get_defect_model().predict_batch, batch)
 
+        results = []
+        defects_detected = 0
+        for file, defect_detected in zip(files, predictions):
             result = {
                 "filename": file.filename,
                 "defect_detected": bool(defect_detected),
                 "confidence": defect_detected  # Confidence value can be extended
             }
             results.append(result)
+            defects_detected += result["defect_detected"]
 
         # Save results to CSV
         save_results_to_csv(results)
 
         # Save uploaded images
-        save_uploaded_images(files)
+        await save_uploaded_images(files)
 
         # Send notification
-        send_notification(f"Batch defect detection completed for {len(files)} files. Defects detected: {sum(result['defect_detected'] for result in results)}")
+        send_notification(f"Batch defect detection completed for {len(files)} files. Defects detected: {defects_detected}")
 
         return {
             "total_files": len(files),
-            "defects_detected": sum(result["defect_detected"] for result in results),
+            "defects_detected": defects_detected,
             "results": results
         }
 
@@ -1,20 +1,49 @@
-from fastapi import APIRouter, HTTPException, Query
-from models.predictive_maintenance import PredictiveMaintenanceModel
+from fastapi import APIRouter, BackgroundTasks, Body, HTTPException, Query
+from models.singletons import get_maintenance_model
 from services.data_service import fetch_maintenance_data
 from config.logging import get_logger
 from functools import lru_cache
+from pydantic import BaseModel
+from typing import List
+import numpy as np
 import smtplib
 from email.mime.text import MIMEText
 from datetime import datetime
-import pandas as pd
+import threading
+import atexit
 import os
 
 # Logger for this module
 logger = get_logger(__name__)
 
-# Initialize router and model
+# Initialize router
 router = APIRouter()
-model = PredictiveMaintenanceModel()
+
+# Response models; FastAPI serializes these straight to JSON bytes in pydantic-core
+class MaintenancePrediction(BaseModel):
+    equipment_id: str
+    next_maintenance_date: str
+    risk_score: float
+
+class MaintenanceBatchResult(BaseModel):
+    results: List[MaintenancePrediction]
+    not_found: List[str]
+
+# Alert SMTP connection, kept open across alerts and reconnected on failure
+SMTP_HOST = "smtp.example.com"
+SMTP_PORT = 587
+SMTP_USER = "user@example.com"
+SMTP_PASSWORD = "password"
+ALERT_SENDER = "noreply@maintenance.com"
+_smtp_server = None
+_smtp_lock = threading.Lock()
+
+# Prediction history file handles, kept open across requests and keyed by path
+HISTORY_HEADER = "equipment_id,timestamp,next_maintenance_date,risk_score\n"
+HISTORY_FLUSH_EVERY = 32
+_history_handles = {}
+_history_pending = {}
+_history_lock = threading.Lock()
 
 # Prediction caching component
 @lru_cache(maxsize=100)
@@ -31,9 +60,54 @@ def cached_predict_maintenance(equipment_id: str):
     data = fetch_maintenance_data(equipment_id)
     if not data:
         raise HTTPException(status_code=404, detail="Equipment data not found")
-    return model.predict(data)
+    return get_maintenance_model().predict(data)
 
 # Alert notification component
+def _connect_smtp() -> smtplib.SMTP:
+    """
+    Open an authenticated SMTP connection for maintenance alerts.
+    """
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
+    server.starttls()
+    server.login(SMTP_USER, SMTP_PASSWORD)
+    return server
+
+def _send_alert_message(recipient: str, msg: MIMEText):
+    """
+    Send a message over the shared SMTP connection, reconnecting once if the
+    server has dropped it.
+    """
+    global _smtp_server
+    with _smtp_lock:
+        for attempt in range(2):
+            if _smtp_server is None:
+                _smtp_server = _connect_smtp()
+            try:
+                _smtp_server.sendmail(ALERT_SENDER, recipient, msg.as_string())
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                try:
+                    _smtp_server.close()
+                finally:
+                    _smtp_server = None
+                if attempt:
+                    raise
+
+def close_smtp_connection():
+    """
+    Close the shared SMTP connection, if one is open.
+    """
+    global _smtp_server
+    with _smtp_lock:
+        if _smtp_server is not None:
+            try:
+                _smtp_server.quit()
+            except (smtplib.SMTPException, OSError):
+                _smtp_server.close()
+            _smtp_server = None
+
+atexit.register(close_smtp_connection)
+
 def send_maintenance_alert(equipment_id: str, next_maintenance_date: str, risk_score: float, recipient: str):
     """
     Send an email alert for predicted maintenance.
@@ -54,39 +128,63 @@ def send_maintenance_alert(equipment_id: str, next_maintenance_date: str, risk_s
         )
         msg = MIMEText(body)
         msg["Subject"] = subject
-        msg["From"] = "noreply@maintenance.com"
+        msg["From"] = ALERT_SENDER
         msg["To"] = recipient
 
-        with smtplib.SMTP("smtp.example.com", 587) as server:
-            server.starttls()
-            server.login("user@example.com", "password")
-            server.sendmail("noreply@maintenance.com", recipient, msg.as_string())
+        _send_alert_message(recipient, msg)
         logger.info(f"Maintenance alert sent to {recipient} for equipment_id {equipment_id}")
     except Exception as e:
         logger.error(f"Failed to send maintenance alert for equipment_id {equipment_id}: {str(e)}")
 
 # Prediction history component
+def _get_history_handle(output_path: str):
+    """
+    Return the open append handle for a history file, creating it on first use.
+    Must be called with _history_lock held.
+    """
+    handle = _history_handles.get(output_path)
+    if handle is None:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        is_new = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        handle = open(output_path, "a", buffering=65536)
+        if is_new:
+            handle.write(HISTORY_HEADER)
+        _history_handles[output_path] = handle
+        _history_pending[output_path] = 0
+    return handle
+
+def flush_prediction_history():
+    """
+    Flush all buffered prediction history rows to disk.
+    """
+    with _history_lock:
+        for output_path, handle in _history_handles.items():
+            handle.flush()
+            _history_pending[output_path] = 0
+
+atexit.register(flush_prediction_history)
+
 def save_prediction_history(equipment_id: str, prediction: dict, output_path: str = "results/prediction_history.csv"):
     """
-    Save maintenance prediction history to a CSV file.
+    Append a maintenance prediction to the history CSV file.
+
+    Rows are written through a long-lived buffered handle and flushed every
+    HISTORY_FLUSH_EVERY writes (and at interpreter exit).
 
     Args:
         equipment_id (str): The unique identifier for the equipment.
         prediction (dict): Predicted maintenance details.
         output_path (str): Path to save the CSV file.
     """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    history_entry = {
-        "equipment_id": equipment_id,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "next_maintenance_date": prediction["next_date"],
-        "risk_score": prediction["risk_score"]
-    }
-    df = pd.DataFrame([history_entry])
-    if os.path.exists(output_path):
-        df.to_csv(output_path, mode="a", header=False, index=False)
-    else:
-        df.to_csv(output_path, index=False)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    line = f"{equipment_id},{timestamp},{prediction['next_date']},{prediction['risk_score']}\n"
+    with _history_lock:
+        handle = _get_history_handle(output_path)
+        handle.write(line)
+        _history_pending[output_path] += 1
+        if _history_pending[output_path] >= HISTORY_FLUSH_EVERY:
+            handle.flush()
+            _history_pending[output_path] = 0
     logger.info(f"Prediction history saved for equipment_id {equipment_id}")
 
 # System health check component
@@ -109,8 +207,9 @@ def check_system_health():
         logger.error(f"System health check failed: {str(e)}")
         return {"status": "unhealthy", "error": str(e)}
 
-@router.get("/predict", summary="Predict maintenance needs for equipment")
+@router.get("/predict", response_model=MaintenancePrediction, summary="Predict maintenance needs for equipment")
 async def predict_maintenance(
+    background_tasks: BackgroundTasks,
     equipment_id: str = Query(..., description="Unique identifier for the equipment"),
     alert_recipient: str = Query(None, description="Email address to send maintenance alerts")
 ):
@@ -118,6 +217,7 @@ async def predict_maintenance(
     Predict maintenance needs for the specified equipment.
 
     Args:
+        background_tasks (BackgroundTasks): Tasks run after the response is sent.
         equipment_id (str): The unique identifier for the equipment.
         alert_recipient (str, optional): Email address to send maintenance alerts.
 
@@ -126,18 +226,20 @@ async def predict_maintenance(
     """
     try:
         # Log the request
-        logger.info(f"Received maintenance prediction request for equipment_id: {equipment_id}")
+        logger.info("Received maintenance prediction request for equipment_id: %s", equipment_id)
 
         # Fetch data and make prediction (with caching)
         prediction = cached_predict_maintenance(equipment_id)
-        logger.info(f"Prediction result for equipment_id {equipment_id}: {prediction}")
+        logger.info("Prediction result for equipment_id %s: %s", equipment_id, prediction)
 
         # Save prediction history
         save_prediction_history(equipment_id, prediction)
 
-        # Send alert if recipient is provided
+        # Send alert after the response so SMTP latency stays off the request path
         if alert_recipient:
-            send_maintenance_alert(equipment_id, prediction["next_date"], prediction["risk_score"], alert_recipient)
+            background_tasks.add_task(
+                send_maintenance_alert, equipment_id, prediction["next_date"], prediction["risk_score"], alert_recipient
+            )
 
         return {
             "equipment_id": equipment_id,
@@ -148,9 +250,53 @@ async def predict_maintenance(
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error during maintenance prediction for equipment_id {equipment_id}: {str(e)}", exc_info=True)
+        logger.error("Error during maintenance prediction for equipment_id %s: %s", equipment_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error processing maintenance prediction request.")
 
+@router.post("/predict-batch", response_model=MaintenanceBatchResult, summary="Predict maintenance needs for multiple equipment")
+async def predict_maintenance_batch(
+    equipment_ids: List[str] = Body(..., description="Unique identifiers for the equipment")
+):
+    """
+    Predict maintenance needs for several pieces of equipment with a single model call.
+
+    Args:
+        equipment_ids (List[str]): The unique identifiers for the equipment.
+
+    Returns:
+        dict: Predicted maintenance details for each equipment and the IDs with no data.
+    """
+    try:
+        logger.info("Received batch maintenance prediction request for %d equipment", len(equipment_ids))
+
+        found_ids = []
+        rows = []
+        not_found = []
+        for equipment_id in equipment_ids:
+            data = fetch_maintenance_data(equipment_id)
+            if not data:
+                not_found.append(equipment_id)
+                continue
+            found_ids.append(equipment_id)
+            rows.append(data)
+
+        results = []
+        if rows:
+            predictions = get_maintenance_model().predict_batch(np.vstack(rows).astype(np.float32))
+            for equipment_id, prediction in zip(found_ids, predictions):
+                save_prediction_history(equipment_id, prediction)
+                results.append({
+                    "equipment_id": equipment_id,
+                    "next_maintenance_date": prediction["next_date"],
+                    "risk_score": prediction["risk_score"]
+                })
+
+        return {"results": results, "not_found": not_found}
+
+    except Exception as e:
+        logger.error("Error during batch maintenance prediction: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Error processing batch maintenance prediction request.")
+
 @router.get("/health", summary="Check system health")
 async def health_check():
     """
@@ -1,115 +1,147 @@
-from fastapi import APIRouter, HTTPException, Body
-from pydantic import BaseModel, validator
-from typing import Optional, Dict, List
-from services.quality_service import QualityService
+from fastapi import APIRouter, HTTPException, Body, Depends, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Annotated, Optional, Dict, List
+from services.quality_service import QualityService, get_quality_service
 from config.logging import get_logger
 import csv
-import os
+import io
+import itertools
+import msgspec
+import orjson
 
 # Logger for this module
 logger = get_logger(__name__)
 
-# Initialize router and service
+# Initialize router
 router = APIRouter()
-quality_service = QualityService()
+
+# Encoded /list response body, rebuilt on the first read after any mutation
+_list_response_cache: Optional[bytes] = None
+
+def invalidate_list_cache():
+    """
+    Drop the cached /list response after quality standards change.
+    """
+    global _list_response_cache
+    _list_response_cache = None
+
+# Threshold values must lie in [0, 1]; the bounds are enforced by pydantic-core
+ThresholdValue = Annotated[float, Field(ge=0.0, le=1.0)]
 
 class QualityStandard(BaseModel):
     standard_id: Optional[str] = None
     name: str
-    description: Optional[str]
-    threshold: Dict[str, float]
-
-    @validator('threshold')
-    def validate_threshold(cls, value):
-        """
-        Validate that threshold values are between 0 and 1.
-        """
-        for key, val in value.items():
-            if not 0 <= val <= 1:
-                raise ValueError(f"Threshold value for '{key}' must be between 0 and 1")
-        return value
+    description: Optional[str] = None
+    threshold: Dict[str, ThresholdValue]
 
 @router.post("/create", summary="Create a new quality standard")
-async def create_quality_standard(standard: QualityStandard):
+async def create_quality_standard(
+    standard: QualityStandard,
+    quality_service: QualityService = Depends(get_quality_service)
+):
     """
     Create a new quality standard.
 
     Args:
         standard (QualityStandard): Details of the quality standard to be created.
+        quality_service (QualityService): Service created by the application lifespan.
 
     Returns:
         dict: Confirmation of the created quality standard.
     """
     try:
-        logger.info(f"Creating quality standard: {standard}")
-        result = quality_service.create_standard(standard.dict())
-        return {"message": "Quality standard created successfully", "data": result}
+        logger.info("Creating quality standard: %s", standard)
+        result = quality_service.create_standard(standard)
+        invalidate_list_cache()
+        content = msgspec.json.encode({"message": "Quality standard created successfully", "data": result})
+        return Response(content=content, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error creating quality standard: {str(e)}", exc_info=True)
+        logger.error("Error creating quality standard: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to create quality standard.")
 
 @router.get("/list", summary="List all quality standards")
-async def list_quality_standards():
+async def list_quality_standards(quality_service: QualityService = Depends(get_quality_service)):
     """
     Retrieve all defined quality standards.
 
+    Args:
+        quality_service (QualityService): Service created by the application lifespan.
+
     Returns:
         list: List of all quality standards.
     """
+    global _list_response_cache
     try:
         logger.info("Fetching all quality standards")
-        standards = quality_service.get_all_standards()
-        return {"data": standards}
+        if _list_response_cache is None:
+            _list_response_cache = orjson.dumps({"data": quality_service.get_all_standards_serialized()})
+        return Response(content=_list_response_cache, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error listing quality standards: {str(e)}", exc_info=True)
+        logger.error("Error listing quality standards: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch quality standards.")
 
 @router.put("/update/{standard_id}", summary="Update an existing quality standard")
-async def update_quality_standard(standard_id: str, standard: QualityStandard):
+async def update_quality_standard(
+    standard_id: str,
+    standard: QualityStandard,
+    quality_service: QualityService = Depends(get_quality_service)
+):
     """
     Update an existing quality standard.
 
     Args:
         standard_id (str): ID of the quality standard to be updated.
         standard (QualityStandard): Updated details of the quality standard.
+        quality_service (QualityService): Service created by the application lifespan.
 
     Returns:
         dict: Confirmation of the update.
     """
     try:
-        logger.info(f"Updating quality standard {standard_id} with data: {standard}")
-        result = quality_service.update_standard(standard_id, standard.dict())
-        return {"message": "Quality standard updated successfully", "data": result}
+        logger.info("Updating quality standard %s with data: %s", standard_id, standard)
+        result = quality_service.update_standard(standard_id, standard)
+        invalidate_list_cache()
+        content = msgspec.json.encode({"message": "Quality standard updated successfully", "data": result})
+        return Response(content=content, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error updating quality standard {standard_id}: {str(e)}", exc_info=True)
+        logger.error("Error updating quality standard %s: %s", standard_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to update quality standard.")
 
 @router.delete("/delete/{standard_id}", summary="Delete a quality standard")
-async def delete_quality_standard(standard_id: str):
+async def delete_quality_standard(
+    standard_id: str,
+    quality_service: QualityService = Depends(get_quality_service)
+):
     """
     Delete a quality standard by its ID.
 
     Args:
         standard_id (str): ID of the quality standard to delete.
+        quality_service (QualityService): Service created by the application lifespan.
 
     Returns:
         dict: Confirmation of the deletion.
     """
     try:
-        logger.info(f"Deleting quality standard with ID: {standard_id}")
+        logger.info("Deleting quality standard with ID: %s", standard_id)
         quality_service.delete_standard(standard_id)
+        invalidate_list_cache()
         return {"message": "Quality standard deleted successfully"}
     except Exception as e:
-        logger.error(f"Error deleting quality standard {standard_id}: {str(e)}", exc_info=True)
+        logger.error("Error deleting quality standard %s: %s", standard_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete quality standard.")
 
-@router.post("/export", summary="Export quality standards to a CSV file")
-async def export_quality_standards():
+@router.post("/export", summary="Export quality standards as a CSV download")
+async def export_quality_standards(quality_service: QualityService = Depends(get_quality_service)):
     """
-    Export all quality standards to a CSV file.
+    Stream all quality standards to the client as a CSV file.
+
+    Args:
+        quality_service (QualityService): Service created by the application lifespan.
 
     Returns:
-        dict: Confirmation of the export and file path.
+        StreamingResponse: CSV attachment with one row per quality standard.
     """
     try:
         logger.info("Exporting quality standards to CSV")
@@ -117,22 +149,23 @@ async def export_quality_standards():
         if not standards:
             raise HTTPException(status_code=404, detail="No quality standards found to export")
 
-        # Ensure the export directory exists
-        export_dir = "exports"
-        os.makedirs(export_dir, exist_ok=True)
-
-        # Define the CSV file path
-        file_path = os.path.join(export_dir, "quality_standards.csv")
-
-        # Write standards to CSV
-        with open(file_path, mode="w", newline="") as file:
-            writer = csv.DictWriter(file, fieldnames=["standard_id", "name", "description", "threshold"])
-            writer.writeheader()
-            for standard in standards:
-                writer.writerow(standard)
-
-        logger.info(f"Quality standards exported to {file_path}")
-        return {"message": "Quality standards exported successfully", "file_path": file_path}
+        def generate_rows():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            rows = ([standard.standard_id, standard.name, standard.description, standard.threshold] for standard in standards)
+            for row in itertools.chain([["standard_id", "name", "description", "threshold"]], rows):
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        return StreamingResponse(
+            generate_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=quality_standards.csv"}
+        )
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        logger.error(f"Error exporting quality standards: {str(e)}", exc_info=True)
+        logger.error("Error exporting quality standards: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to export quality standards.")
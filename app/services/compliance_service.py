@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException, Body
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Body, Depends, Request, Response
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, Dict, List
 from config.logging import get_logger
-import json
+import aiofiles
+import aiofiles.os
+import aiosqlite
+import asyncio
+import orjson
 import os
+import time
 import uuid
 
 # Logger for this module
@@ -12,46 +17,130 @@ logger = get_logger(__name__)
 # Initialize router
 router = APIRouter()
 
+COMPLIANCE_DB_PATH = "data/compliance.db"
+LEGACY_COMPLIANCE_CHECKS_PATH = "data/compliance_checks.json"
+LEGACY_COMPLIANCE_WAL_PATH = "data/compliance_checks.wal"
+AUDIT_LOG_PATH = "logs/audit/compliance_audit.log"
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.1
+
 class ComplianceCheck(BaseModel):
     check_id: Optional[str] = None
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     requirements: List[str]
     status: Optional[str] = "Pending"
 
+# Validates whole lists of checks from the legacy JSON store in one pydantic-core call
+_ADAPTER = TypeAdapter(List[ComplianceCheck])
+
+# Response models; FastAPI serializes these straight to JSON bytes in pydantic-core
+class ComplianceCheckResponse(BaseModel):
+    message: str
+    data: ComplianceCheck
+
+class ComplianceChecksResponse(BaseModel):
+    message: str
+    data: List[ComplianceCheck]
+
+def _to_row(check: ComplianceCheck) -> tuple:
+    return (check.check_id, check.name, check.description, orjson.dumps(check.requirements).decode(), check.status)
+
+def _from_row(row: tuple) -> Dict:
+    return {
+        "check_id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "requirements": orjson.loads(row[3]),
+        "status": row[4],
+    }
+
 class ComplianceService:
+    """
+    Compliance check store backed by a SQLite table keyed on check_id.
+
+    Every mutation is a single-row statement instead of a whole-file rewrite, and
+    lookups by check_id use the primary key index. The database runs in WAL journal
+    mode so several worker processes can read while one of them writes.
+    """
     def __init__(self):
-        self.compliance_checks = self._load_compliance_checks()
+        self._db: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
 
-    def _load_compliance_checks(self) -> List[ComplianceCheck]:
+    @classmethod
+    async def create(cls) -> "ComplianceService":
         """
-        Load compliance checks from a JSON file.
+        Construct the service and open its database. Called from the application lifespan.
 
         Returns:
-            List[ComplianceCheck]: List of compliance checks.
+            ComplianceService: The connected service.
         """
-        try:
-            if os.path.exists("data/compliance_checks.json"):
-                with open("data/compliance_checks.json", "r") as file:
-                    data = json.load(file)
-                    return [ComplianceCheck(**item) for item in data]
-            return []
-        except Exception as e:
-            logger.error(f"Error loading compliance checks: {str(e)}", exc_info=True)
-            return []
+        service = cls()
+        await service.load()
+        return service
+
+    async def load(self):
+        """
+        Open the database, create the schema and import any legacy JSON store.
+        """
+        os.makedirs(os.path.dirname(COMPLIANCE_DB_PATH), exist_ok=True)
+        self._db = await aiosqlite.connect(COMPLIANCE_DB_PATH)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS compliance_checks ("
+            "check_id TEXT PRIMARY KEY, name TEXT, description TEXT, requirements TEXT, status TEXT)"
+        )
+        await self._db.commit()
+        await self._import_legacy_store()
+
+    async def close(self):
+        """
+        Close the database connection.
+        """
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
 
-    def _save_compliance_checks(self):
+    async def _import_legacy_store(self):
         """
-        Save compliance checks to a JSON file.
+        Move checks from the old JSON snapshot and write-ahead log into the database, once.
         """
+        legacy_paths = [
+            path for path in (LEGACY_COMPLIANCE_CHECKS_PATH, LEGACY_COMPLIANCE_WAL_PATH)
+            if await aiofiles.os.path.exists(path)
+        ]
+        if not legacy_paths:
+            return
         try:
-            os.makedirs("data", exist_ok=True)
-            with open("data/compliance_checks.json", "w") as file:
-                json.dump([check.dict() for check in self.compliance_checks], file, indent=4)
+            checks: Dict[str, Dict] = {}
+            if LEGACY_COMPLIANCE_CHECKS_PATH in legacy_paths:
+                async with aiofiles.open(LEGACY_COMPLIANCE_CHECKS_PATH, "rb") as file:
+                    for item in orjson.loads(await file.read()):
+                        checks[item["check_id"]] = item
+            if LEGACY_COMPLIANCE_WAL_PATH in legacy_paths:
+                async with aiofiles.open(LEGACY_COMPLIANCE_WAL_PATH, "rb") as file:
+                    for line in (await file.read()).splitlines():
+                        if not line.strip():
+                            continue
+                        event = orjson.loads(line)
+                        if event["op"] == "upsert":
+                            checks[event["check"]["check_id"]] = event["check"]
+                        elif event["op"] == "delete":
+                            checks.pop(event["check_id"], None)
+            async with self._write_lock:
+                await self._db.executemany(
+                    "INSERT OR REPLACE INTO compliance_checks VALUES (?, ?, ?, ?, ?)",
+                    [_to_row(check) for check in _ADAPTER.validate_python(list(checks.values()))]
+                )
+                await self._db.commit()
+            for path in legacy_paths:
+                await aiofiles.os.replace(path, f"{path}.migrated")
+            logger.info("Imported %s compliance checks from the legacy JSON store", len(checks))
         except Exception as e:
-            logger.error(f"Error saving compliance checks: {str(e)}", exc_info=True)
+            logger.error("Error importing legacy compliance checks: %s", e, exc_info=True)
 
-    def create_compliance_check(self, check: ComplianceCheck):
+    async def create_compliance_check(self, check: ComplianceCheck):
         """
         Create a new compliance check.
 
@@ -62,20 +151,42 @@ class ComplianceService:
             ComplianceCheck: The created compliance check.
         """
         check.check_id = str(uuid.uuid4())  # Generate a unique ID
-        self.compliance_checks.append(check)
-        self._save_compliance_checks()
+        async with self._write_lock:
+            await self._db.execute("INSERT INTO compliance_checks VALUES (?, ?, ?, ?, ?)", _to_row(check))
+            await self._db.commit()
         return check
 
-    def get_all_compliance_checks(self) -> List[ComplianceCheck]:
+    async def create_many(self, checks: List[ComplianceCheck]) -> List[ComplianceCheck]:
         """
-        Retrieve all compliance checks.
+        Create several compliance checks in a single transaction.
+
+        Args:
+            checks (List[ComplianceCheck]): The compliance checks to create.
 
         Returns:
-            List[ComplianceCheck]: List of all compliance checks.
+            List[ComplianceCheck]: The created compliance checks.
+        """
+        for check in checks:
+            check.check_id = str(uuid.uuid4())  # Generate a unique ID
+        async with self._write_lock:
+            await self._db.executemany(
+                "INSERT INTO compliance_checks VALUES (?, ?, ?, ?, ?)",
+                [_to_row(check) for check in checks]
+            )
+            await self._db.commit()
+        return checks
+
+    async def get_all_compliance_checks_serialized(self) -> List[Dict]:
         """
-        return self.compliance_checks
+        Retrieve all compliance checks as plain dicts, without building models.
 
-    def update_compliance_check(self, check_id: str, updated_check: ComplianceCheck):
+        Returns:
+            List[Dict]: Serialized form of every compliance check.
+        """
+        async with self._db.execute("SELECT check_id, name, description, requirements, status FROM compliance_checks") as cursor:
+            return [_from_row(row) for row in await cursor.fetchall()]
+
+    async def update_compliance_check(self, check_id: str, updated_check: ComplianceCheck):
         """
         Update an existing compliance check.
 
@@ -86,50 +197,133 @@ class ComplianceService:
         Returns:
             ComplianceCheck: The updated compliance check.
         """
-        for check in self.compliance_checks:
-            if check.check_id == check_id:
-                check.name = updated_check.name
-                check.description = updated_check.description
-                check.requirements = updated_check.requirements
-                check.status = updated_check.status
-                self._save_compliance_checks()
-                return check
-        raise HTTPException(status_code=404, detail="Compliance check not found")
+        check = updated_check.model_copy(update={"check_id": check_id})
+        async with self._write_lock:
+            cursor = await self._db.execute(
+                "UPDATE compliance_checks SET name = ?, description = ?, requirements = ?, status = ? WHERE check_id = ?",
+                _to_row(check)[1:] + (check_id,)
+            )
+            await self._db.commit()
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Compliance check not found")
+        return check
 
-    def delete_compliance_check(self, check_id: str):
+    async def delete_compliance_check(self, check_id: str):
         """
         Delete a compliance check by its ID.
 
         Args:
             check_id (str): The ID of the compliance check to delete.
         """
-        self.compliance_checks = [check for check in self.compliance_checks if check.check_id != check_id]
-        self._save_compliance_checks()
+        async with self._write_lock:
+            await self._db.execute("DELETE FROM compliance_checks WHERE check_id = ?", (check_id,))
+            await self._db.commit()
 
-# Initialize service
-compliance_service = ComplianceService()
+def get_compliance_service(request: Request) -> ComplianceService:
+    """
+    Dependency returning the ComplianceService created by the application lifespan.
+    """
+    return request.app.state.compliance
 
 # Audit Logging Component
+#
+# While the application is running, audit entries are queued and a single background
+# task appends them in batches of up to AUDIT_BATCH_SIZE entries, or whatever arrived
+# within AUDIT_FLUSH_INTERVAL_SECONDS. Outside the application lifespan entries are
+# written synchronously.
+_audit_queue: Optional[asyncio.Queue] = None
+_audit_writer: Optional[asyncio.Task] = None
+
+def start_audit_writer():
+    """
+    Start the background audit log writer. Called from the application lifespan.
+    """
+    global _audit_queue, _audit_writer
+    os.makedirs(os.path.dirname(AUDIT_LOG_PATH), exist_ok=True)
+    _audit_queue = asyncio.Queue()
+    _audit_writer = asyncio.create_task(_run_audit_writer(_audit_queue))
+
+async def stop_audit_writer():
+    """
+    Flush queued audit entries and stop the background writer.
+    """
+    global _audit_queue, _audit_writer
+    if _audit_writer is None:
+        return
+    _audit_queue.put_nowait(None)
+    await _audit_writer
+    _audit_queue = None
+    _audit_writer = None
+
+async def _run_audit_writer(queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        entry = await queue.get()
+        if entry is None:
+            return
+        batch = [entry]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+        stopping = False
+        while len(batch) < AUDIT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if entry is None:
+                stopping = True
+                break
+            batch.append(entry)
+        await _write_audit_entries(batch)
+        if stopping:
+            return
+
+async def _write_audit_entries(entries: List[Dict]):
+    try:
+        async with aiofiles.open(AUDIT_LOG_PATH, "ab") as log_file:
+            await log_file.write(b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+    except Exception as e:
+        logger.error("Error writing audit events: %s", e, exc_info=True)
+
 def log_audit_event(event_type: str, event_details: Dict):
     """
     Log audit events for compliance checks.
 
+    Entries carry an integer "timestamp_ns" (Unix epoch nanoseconds); format it when
+    reading the log.
+
     Args:
         event_type (str): Type of event (e.g., "create", "update", "delete").
         event_details (Dict): Details of the event.
     """
+    log_audit_events(event_type, [event_details])
+
+def log_audit_events(event_type: str, events_details: List[Dict]):
+    """
+    Log several audit events of the same type with a single write.
+
+    Args:
+        event_type (str): Type of event (e.g., "create", "update", "delete").
+        events_details (List[Dict]): Details of each event.
+    """
     try:
-        os.makedirs("logs/audit", exist_ok=True)
-        log_entry = {
-            "timestamp": str(datetime.now()),
-            "event_type": event_type,
-            "event_details": event_details
-        }
-        with open("logs/audit/compliance_audit.log", "a") as log_file:
-            log_file.write(json.dumps(log_entry) + "\n")
-        logger.info(f"Audit event logged: {event_type}")
+        timestamp_ns = time.time_ns()
+        entries = [
+            {"timestamp_ns": timestamp_ns, "event_type": event_type, "event_details": event_details}
+            for event_details in events_details
+        ]
+        if _audit_queue is not None:
+            for entry in entries:
+                _audit_queue.put_nowait(entry)
+        else:
+            os.makedirs(os.path.dirname(AUDIT_LOG_PATH), exist_ok=True)
+            with open(AUDIT_LOG_PATH, "ab") as log_file:
+                log_file.writelines(orjson.dumps(entry) + b"\n" for entry in entries)
+        logger.info("Audit events logged: %s x%s", event_type, len(entries))
     except Exception as e:
-        logger.error(f"Error logging audit event: {str(e)}", exc_info=True)
+        logger.error("Error logging audit event: %s", e, exc_info=True)
 
 # Notification Component
 def send_notification(message: str, recipient: str):
@@ -142,88 +336,133 @@ def send_notification(message: str, recipient: str):
     """
     try:
         # Simulate sending a notification
-        logger.info(f"Notification sent to {recipient}: {message}")
+        logger.info("Notification sent to %s: %s", recipient, message)
     except Exception as e:
-        logger.error(f"Error sending notification: {str(e)}", exc_info=True)
+        logger.error("Error sending notification: %s", e, exc_info=True)
 
-@router.post("/compliance/create", summary="Create a new compliance check")
-async def create_compliance_check(check: ComplianceCheck):
+@router.post("/compliance/create", response_model=ComplianceCheckResponse, summary="Create a new compliance check")
+async def create_compliance_check(
+    check: ComplianceCheck,
+    compliance_service: ComplianceService = Depends(get_compliance_service)
+):
     """
     Create a new compliance check.
 
     Args:
         check (ComplianceCheck): The compliance check to create.
+        compliance_service (ComplianceService): Service created by the application lifespan.
 
     Returns:
         dict: Confirmation of the created compliance check.
     """
     try:
-        logger.info(f"Creating compliance check: {check}")
-        result = compliance_service.create_compliance_check(check)
+        logger.info("Creating compliance check: %s", check)
+        result = await compliance_service.create_compliance_check(check)
         log_audit_event("create", {"check_id": result.check_id, "name": result.name})
         send_notification(f"New compliance check created: {result.name}", "admin@example.com")
         return {"message": "Compliance check created successfully", "data": result}
     except Exception as e:
-        logger.error(f"Error creating compliance check: {str(e)}", exc_info=True)
+        logger.error("Error creating compliance check: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to create compliance check.")
 
+@router.post("/compliance/batch", response_model=ComplianceChecksResponse, summary="Create several compliance checks in one request")
+async def create_compliance_checks_batch(
+    checks: List[ComplianceCheck],
+    compliance_service: ComplianceService = Depends(get_compliance_service)
+):
+    """
+    Create several compliance checks with one round-trip and one write.
+
+    Args:
+        checks (List[ComplianceCheck]): The compliance checks to create.
+        compliance_service (ComplianceService): Service created by the application lifespan.
+
+    Returns:
+        dict: Confirmation and the created compliance checks.
+    """
+    try:
+        logger.info("Creating %s compliance checks", len(checks))
+        results = await compliance_service.create_many(checks)
+        log_audit_events("create", [{"check_id": result.check_id, "name": result.name} for result in results])
+        send_notification(f"{len(results)} compliance checks created", "admin@example.com")
+        return {"message": "Compliance checks created successfully", "data": results}
+    except Exception as e:
+        logger.error("Error creating compliance checks: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to create compliance checks.")
+
 @router.get("/compliance/list", summary="List all compliance checks")
-async def list_compliance_checks():
+async def list_compliance_checks(
+    compliance_service: ComplianceService = Depends(get_compliance_service)
+):
     """
     Retrieve all compliance checks.
 
+    Args:
+        compliance_service (ComplianceService): Service created by the application lifespan.
+
     Returns:
         list: List of all compliance checks.
     """
     try:
         logger.info("Fetching all compliance checks")
-        checks = compliance_service.get_all_compliance_checks()
-        return {"data": checks}
+        # Read from the shared database on every request so writes made by other
+        # worker processes are visible immediately
+        content = orjson.dumps({"data": await compliance_service.get_all_compliance_checks_serialized()})
+        return Response(content=content, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error listing compliance checks: {str(e)}", exc_info=True)
+        logger.error("Error listing compliance checks: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch compliance checks.")
 
-@router.put("/compliance/update/{check_id}", summary="Update an existing compliance check")
-async def update_compliance_check(check_id: str, check: ComplianceCheck):
+@router.put("/compliance/update/{check_id}", response_model=ComplianceCheckResponse, summary="Update an existing compliance check")
+async def update_compliance_check(
+    check_id: str,
+    check: ComplianceCheck,
+    compliance_service: ComplianceService = Depends(get_compliance_service)
+):
     """
     Update an existing compliance check.
 
     Args:
         check_id (str): The ID of the compliance check to update.
         check (ComplianceCheck): The updated compliance check.
+        compliance_service (ComplianceService): Service created by the application lifespan.
 
     Returns:
         dict: Confirmation of the update.
     """
     try:
-        logger.info(f"Updating compliance check {check_id} with data: {check}")
-        result = compliance_service.update_compliance_check(check_id, check)
-        log_audit_event("update", {"check_id": check_id, "updated_data": check.dict()})
+        logger.info("Updating compliance check %s with data: %s", check_id, check)
+        result = await compliance_service.update_compliance_check(check_id, check)
+        log_audit_event("update", {"check_id": check_id, "updated_data": check.model_dump()})
         send_notification(f"Compliance check updated: {check.name}", "admin@example.com")
         return {"message": "Compliance check updated successfully", "data": result}
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error updating compliance check {check_id}: {str(e)}", exc_info=True)
+        logger.error("Error updating compliance check %s: %s", check_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to update compliance check.")
 
 @router.delete("/compliance/delete/{check_id}", summary="Delete a compliance check")
-async def delete_compliance_check(check_id: str):
+async def delete_compliance_check(
+    check_id: str,
+    compliance_service: ComplianceService = Depends(get_compliance_service)
+):
     """
     Delete a compliance check by its ID.
 
     Args:
         check_id (str): The ID of the compliance check to delete.
+        compliance_service (ComplianceService): Service created by the application lifespan.
 
     Returns:
         dict: Confirmation of the deletion.
     """
     try:
-        logger.info(f"Deleting compliance check with ID: {check_id}")
-        compliance_service.delete_compliance_check(check_id)
+        logger.info("Deleting compliance check with ID: %s", check_id)
+        await compliance_service.delete_compliance_check(check_id)
         log_audit_event("delete", {"check_id": check_id})
         send_notification(f"Compliance check deleted: {check_id}", "admin@example.com")
         return {"message": "Compliance check deleted successfully"}
     except Exception as e:
-        logger.error(f"Error deleting compliance check {check_id}: {str(e)}", exc_info=True)
+        logger.error("Error deleting compliance check %s: %s", check_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete compliance check.")
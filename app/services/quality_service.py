@@ -1,7 +1,12 @@
-from pydantic import BaseModel
 from typing import Optional, Dict, List
-import json
+from fastapi import Request
+import atexit
+import fcntl
+import mmap
+import msgspec
+import orjson
 import os
+import threading
 from config.logging import get_logger
 import uuid
 from datetime import datetime
@@ -9,57 +14,262 @@ from datetime import datetime
 # Logger for this module
 logger = get_logger(__name__)
 
-class QualityStandard(BaseModel):
+QUALITY_STANDARDS_PATH = "data/quality_standards.json"
+QUALITY_JOURNAL_PATH = "data/quality_standards.journal"
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+JOURNAL_FLUSH_DELAY_SECONDS = 0.1
+AUDIT_LOG_PATH = "logs/audit/quality_audit.log"
+
+class QualityStandard(msgspec.Struct, kw_only=True):
+    """
+    Stored quality standard. Request bodies are validated by the pydantic model in
+    routes/quality_routes.py; msgspec's compiled codecs handle loading and dumping here.
+    """
     standard_id: Optional[str] = None
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     threshold: Dict[str, float]
 
 class QualityService:
+    """
+    Quality standards held in a dict index, persisted as a JSON snapshot plus an append-only journal.
+
+    Each mutation queues one JSON line for QUALITY_JOURNAL_PATH instead of rewriting the
+    whole snapshot, and returns without touching the disk. A background thread wakes on the
+    first mutation, waits JOURNAL_FLUSH_DELAY_SECONDS so a burst of mutations is written out
+    together, appends the queued lines in a single write and folds the journal into the
+    snapshot once it grows past JOURNAL_COMPACT_BYTES.
+
+    Several worker processes may share the files. Appends hold a shared flock on the
+    journal and compaction an exclusive one, and compaction rebuilds the snapshot from the
+    files rather than from this process's memory, so entries journaled by other workers
+    are kept.
+
+    The plain-dict form of every standard is cached in _serialized when the standard is
+    written, so journal events and list responses reuse it instead of converting every
+    standard again.
+    """
     def __init__(self):
-        self.quality_standards = self._load_quality_standards()
+        self._by_id: Dict[str, QualityStandard] = {}
+        self._serialized: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._journaled = False
+        os.makedirs(os.path.dirname(QUALITY_JOURNAL_PATH), exist_ok=True)
+        self._journal_fd = os.open(QUALITY_JOURNAL_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._journal_fd, fcntl.LOCK_EX)
+            standards = self._read_store()
+            # Drop a torn final entry so the next append starts on a fresh line
+            os.ftruncate(self._journal_fd, self._journal_end)
+            fcntl.flock(self._journal_fd, fcntl.LOCK_UN)
+        except Exception:
+            # Closing the descriptor also drops the flock
+            os.close(self._journal_fd)
+            raise
+        for standard in standards.values():
+            self._apply_upsert(standard)
+        self._start_compactor()
+        os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.close)
+
+    def _start_compactor(self):
+        self._stop = threading.Event()
+        self._dirty = threading.Event()
+        self._compactor = threading.Thread(target=self._run_compactor, name="quality-journal", daemon=True)
+        self._compactor.start()
+
+    def _after_fork(self):
+        """
+        Threads do not survive fork, so give a forked child its own lock, journal
+        descriptor and flush thread. Entries still queued belong to the parent, which
+        writes them; the child's own flock needs a descriptor it does not share.
+        """
+        if self._stop.is_set():
+            return
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._journaled = False
+        os.close(self._journal_fd)
+        self._journal_fd = os.open(QUALITY_JOURNAL_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._start_compactor()
 
     def _load_quality_standards(self) -> List[QualityStandard]:
         """
-        Load quality standards from a JSON file.
+        Load quality standards from the JSON snapshot.
+
+        The file is memory-mapped and decoded in place by msgspec straight into
+        QualityStandard structs, validating types in the same pass. A snapshot that fails
+        to decode raises instead of loading as empty, so it is never compacted away.
 
         Returns:
             List[QualityStandard]: List of quality standards.
         """
-        try:
-            if os.path.exists("data/quality_standards.json"):
-                with open("data/quality_standards.json", "r") as file:
-                    data = json.load(file)
-                    return [QualityStandard(**item) for item in data]
+        if not os.path.exists(QUALITY_STANDARDS_PATH) or os.path.getsize(QUALITY_STANDARDS_PATH) == 0:
             return []
+        try:
+            with open(QUALITY_STANDARDS_PATH, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        return msgspec.json.decode(view, type=List[QualityStandard])
         except Exception as e:
             logger.error(f"Error loading quality standards: {str(e)}", exc_info=True)
-            return []
+            raise
+
+    def _read_journal(self) -> List[Dict]:
+        """
+        Read the mutations recorded in the journal.
+
+        Every entry ends in a newline and is appended in one write, so only a crash during
+        that write can leave a final line without one; such a torn entry is skipped and
+        self._journal_end is set to the size of the complete entries.
+
+        Returns:
+            List[Dict]: Journal events in the order they were written.
+        """
+        with open(QUALITY_JOURNAL_PATH, "rb") as file:
+            data = file.read()
+        lines = data.split(b"\n")
+        self._journal_end = len(data) - len(lines[-1])
+        if lines[-1].strip():
+            logger.warning("Ignoring incomplete entry at the end of the quality standards journal")
+        try:
+            return [orjson.loads(line) for line in lines[:-1] if line.strip()]
+        except Exception as e:
+            logger.error(f"Error replaying quality standards journal: {str(e)}", exc_info=True)
+            raise
+
+    def _read_store(self) -> Dict[str, QualityStandard]:
+        """
+        Rebuild the stored standards from the snapshot and journal on disk.
+        Must be called with a flock held on the journal.
+
+        Returns:
+            Dict[str, QualityStandard]: Stored standards keyed by standard_id.
+        """
+        standards = {standard.standard_id: standard for standard in self._load_quality_standards()}
+        for event in self._read_journal():
+            if event["op"] == "upsert":
+                standard = msgspec.convert(event["standard"], QualityStandard)
+                standards[standard.standard_id] = standard
+            elif event["op"] == "delete":
+                standards.pop(event["standard_id"], None)
+        return standards
+
+    def _apply_upsert(self, standard: QualityStandard) -> Dict:
+        self._by_id[standard.standard_id] = standard
+        serialized = self._serialized[standard.standard_id] = msgspec.to_builtins(standard)
+        return serialized
 
-    def _save_quality_standards(self):
+    def _apply_delete(self, standard_id: str) -> bool:
+        self._serialized.pop(standard_id, None)
+        return self._by_id.pop(standard_id, None) is not None
+
+    def _append_event(self, event: Dict):
+        """
+        Queue one mutation for the journal. Must be called with self._lock held.
+
+        Args:
+            event (Dict): Event with an "op" field ("upsert" or "delete").
+        """
+        self._pending += orjson.dumps(event) + b"\n"
+        self._journaled = True
+        self._dirty.set()
+
+    def _write_pending(self):
+        """
+        Append queued journal entries in a single write. Must be called with self._lock held.
+        """
+        if not self._pending:
+            return
+        fcntl.flock(self._journal_fd, fcntl.LOCK_SH)
+        try:
+            os.write(self._journal_fd, self._pending)
+        finally:
+            fcntl.flock(self._journal_fd, fcntl.LOCK_UN)
+        self._pending.clear()
+
+    def _run_compactor(self):
+        while not self._stop.is_set():
+            self._dirty.wait()
+            # Let the rest of a burst of mutations land before writing it out in one go
+            self._stop.wait(JOURNAL_FLUSH_DELAY_SECONDS)
+            self._dirty.clear()
+            try:
+                if self.flush() >= JOURNAL_COMPACT_BYTES:
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Error writing quality standards journal: {str(e)}", exc_info=True)
+
+    def flush(self) -> int:
+        """
+        Write queued journal entries to disk.
+
+        Returns:
+            int: Current size of the journal in bytes.
+        """
+        with self._lock:
+            self._write_pending()
+            return os.fstat(self._journal_fd).st_size
+
+    def compact(self):
         """
-        Save quality standards to a JSON file.
+        Atomically rewrite the snapshot from the snapshot and journal on disk, then truncate the journal.
         """
         try:
-            os.makedirs("data", exist_ok=True)
-            with open("data/quality_standards.json", "w") as file:
-                json.dump([standard.dict() for standard in self.quality_standards], file, indent=4)
+            with self._lock:
+                self._write_pending()
+                fcntl.flock(self._journal_fd, fcntl.LOCK_EX)
+                try:
+                    standards = self._read_store()
+                    tmp_path = f"{QUALITY_STANDARDS_PATH}.tmp"
+                    payload = orjson.dumps(
+                        [msgspec.to_builtins(standard) for standard in standards.values()],
+                        option=orjson.OPT_INDENT_2
+                    )
+                    with open(tmp_path, "wb") as file:
+                        file.write(payload)
+                    os.replace(tmp_path, QUALITY_STANDARDS_PATH)
+                    os.ftruncate(self._journal_fd, 0)
+                finally:
+                    fcntl.flock(self._journal_fd, fcntl.LOCK_UN)
+            logger.info("Quality standards journal compacted")
         except Exception as e:
-            logger.error(f"Error saving quality standards: {str(e)}", exc_info=True)
+            logger.error(f"Error compacting quality standards: {str(e)}", exc_info=True)
+
+    def close(self):
+        """
+        Stop the background thread and, if this process journaled anything, fold the
+        journal into the snapshot.
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._dirty.set()
+        self._compactor.join()
+        if self._journaled:
+            self.compact()
+        os.close(self._journal_fd)
 
     def create_standard(self, standard: QualityStandard) -> QualityStandard:
         """
         Create a new quality standard.
 
         Args:
-            standard (QualityStandard): The quality standard to create.
+            standard (QualityStandard): The quality standard to create; any object with
+                name, description and threshold attributes, such as the request model.
 
         Returns:
             QualityStandard: The created quality standard.
         """
-        standard.standard_id = str(uuid.uuid4())  # Generate a unique ID
-        self.quality_standards.append(standard)
-        self._save_quality_standards()
+        standard = QualityStandard(
+            standard_id=str(uuid.uuid4()),  # Generate a unique ID
+            name=standard.name,
+            description=standard.description,
+            threshold=dict(standard.threshold),
+        )
+        with self._lock:
+            self._append_event({"op": "upsert", "standard": self._apply_upsert(standard)})
         logger.info(f"Quality standard created: {standard.name}")
         return standard
 
@@ -70,7 +280,16 @@ class QualityService:
         Returns:
             List[QualityStandard]: List of all quality standards.
         """
-        return self.quality_standards
+        return list(self._by_id.values())
+
+    def get_all_standards_serialized(self) -> List[Dict]:
+        """
+        Retrieve all quality standards as cached plain dicts. Callers must not mutate them.
+
+        Returns:
+            List[Dict]: Serialized form of every quality standard.
+        """
+        return list(self._serialized.values())
 
     def update_standard(self, standard_id: str, updated_standard: QualityStandard) -> QualityStandard:
         """
@@ -83,15 +302,16 @@ class QualityService:
         Returns:
             QualityStandard: The updated quality standard.
         """
-        for standard in self.quality_standards:
-            if standard.standard_id == standard_id:
-                standard.name = updated_standard.name
-                standard.description = updated_standard.description
-                standard.threshold = updated_standard.threshold
-                self._save_quality_standards()
-                logger.info(f"Quality standard updated: {standard_id}")
-                return standard
-        raise ValueError("Quality standard not found")
+        with self._lock:
+            standard = self._by_id.get(standard_id)
+            if standard is None:
+                raise ValueError("Quality standard not found")
+            standard.name = updated_standard.name
+            standard.description = updated_standard.description
+            standard.threshold = updated_standard.threshold
+            self._append_event({"op": "upsert", "standard": self._apply_upsert(standard)})
+        logger.info(f"Quality standard updated: {standard_id}")
+        return standard
 
     def delete_standard(self, standard_id: str):
         """
@@ -100,11 +320,34 @@ class QualityService:
         Args:
             standard_id (str): The ID of the quality standard to delete.
         """
-        self.quality_standards = [standard for standard in self.quality_standards if standard.standard_id != standard_id]
-        self._save_quality_standards()
+        with self._lock:
+            if not self._apply_delete(standard_id):
+                # Nothing to delete, so nothing to journal
+                return
+            self._append_event({"op": "delete", "standard_id": standard_id})
         logger.info(f"Quality standard deleted: {standard_id}")
 
 # Audit Logging Component
+#
+# Entries are appended with a single os.write on an O_APPEND descriptor. The kernel
+# positions every write at the end of the file, so concurrent writers need no lock and
+# nothing is left sitting in a user-space buffer.
+_audit_fd = None
+_audit_fd_lock = threading.Lock()
+
+def _get_audit_fd() -> int:
+    """
+    Return the audit log descriptor, opening it on first use.
+    """
+    global _audit_fd
+    if _audit_fd is None:
+        with _audit_fd_lock:
+            if _audit_fd is None:
+                os.makedirs(os.path.dirname(AUDIT_LOG_PATH), exist_ok=True)
+                _audit_fd = os.open(AUDIT_LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                atexit.register(os.close, _audit_fd)
+    return _audit_fd
+
 def log_audit_event(event_type: str, event_details: Dict):
     """
     Log audit events for quality standards.
@@ -114,14 +357,12 @@ def log_audit_event(event_type: str, event_details: Dict):
         event_details (Dict): Details of the event.
     """
     try:
-        os.makedirs("logs/audit", exist_ok=True)
         log_entry = {
             "timestamp": str(datetime.now()),
             "event_type": event_type,
             "event_details": event_details
         }
-        with open("logs/audit/quality_audit.log", "a") as log_file:
-            log_file.write(json.dumps(log_entry) + "\n")
+        os.write(_get_audit_fd(), orjson.dumps(log_entry) + b"\n")
         logger.info(f"Audit event logged: {event_type}")
     except Exception as e:
         logger.error(f"Error logging audit event: {str(e)}", exc_info=True)
@@ -141,5 +382,8 @@ def send_notification(message: str, recipient: str):
     except Exception as e:
         logger.error(f"Error sending notification: {str(e)}", exc_info=True)
 
-# Initialize service
-quality_service = QualityService()
+def get_quality_service(request: Request) -> QualityService:
+    """
+    Dependency returning the QualityService created by the application lifespan.
+    """
+    return request.app.state.quality
@@ -1,8 +1,11 @@
 import streamlit as st
-from PIL import Image
 import requests
-import io
+from requests.adapters import HTTPAdapter
 import datetime
+import os
+
+# Base URL of the quality control API
+API_URL = os.getenv("API_URL", "http://localhost:8000")
 
 # Set page title
 st.set_page_config(page_title="AI-Powered Quality Control", layout="wide")
@@ -18,6 +21,15 @@ def authenticate_user(username: str, password: str) -> bool:
     """
     return username == "admin" and password == "password"
 
+# API Client Component
+# One pooled session per browser session, so repeated API calls reuse kept-alive connections
+if "http" not in st.session_state:
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    st.session_state.http = http
+
 # Display login form if not authenticated
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
@@ -50,18 +62,27 @@ elif nav == "Defect Detection":
     uploaded_file = st.file_uploader("Choose an image...", type=["jpg", "jpeg", "png"])
 
     if uploaded_file is not None:
-        # Display uploaded image
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Uploaded Image", use_column_width=True)
+        # Keep the uploaded bytes as-is: Streamlit displays them directly and the API
+        # receives the original file, so the client never decodes or re-encodes the image
+        raw = uploaded_file.getvalue()
+        st.image(raw, caption="Uploaded Image", use_column_width=True)
 
-        # Simulate API call for defect detection (replace with actual API call)
         if st.button("Detect Defect"):
-            # Simulate prediction (Replace with API call result)
-            result = {"defect_found": True, "confidence": 95.7}
-            if result["defect_found"]:
-                st.write(f"Defect Detected! Confidence: {result['confidence']}%")
+            try:
+                response = st.session_state.http.post(
+                    f"{API_URL}/defects/detect",
+                    files={"file": (uploaded_file.name, raw, uploaded_file.type)},
+                    timeout=30,
+                )
+                response.raise_for_status()
+                result = response.json()
+            except requests.RequestException as e:
+                st.error(f"Defect detection failed: {e}")
             else:
-                st.write(f"No Defect Found. Confidence: {result['confidence']}%")
+                if result["defect_detected"]:
+                    st.write(f"Defect Detected! Confidence: {result['confidence']}")
+                else:
+                    st.write(f"No Defect Found. Confidence: {result['confidence']}")
 
 # Maintenance Prediction Page
 elif nav == "Maintenance Prediction":
@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+import orjson
+import pytest
+
+import services.compliance_service as compliance_service
+from services.compliance_service import ComplianceCheck, ComplianceService
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+
+def _write_legacy_store():
+    checks = [
+        {"check_id": "a", "name": "A", "description": None, "requirements": ["r1"], "status": "Pending"},
+        {"check_id": "b", "name": "B", "description": "kept", "requirements": [], "status": "Passed"},
+    ]
+    with open(compliance_service.LEGACY_COMPLIANCE_CHECKS_PATH, "wb") as file:
+        file.write(orjson.dumps(checks))
+    events = [
+        {"op": "upsert", "check": {"check_id": "c", "name": "C", "description": None, "requirements": [], "status": "Pending"}},
+        {"op": "delete", "check_id": "a"},
+    ]
+    with open(compliance_service.LEGACY_COMPLIANCE_WAL_PATH, "wb") as file:
+        file.write(b"".join(orjson.dumps(event) + b"\n" for event in events))
+
+async def _names(service: ComplianceService) -> list:
+    return sorted(check["name"] for check in await service.get_all_compliance_checks_serialized())
+
+def test_legacy_store_is_imported_once():
+    _write_legacy_store()
+
+    async def scenario():
+        service = await ComplianceService.create()
+        assert await _names(service) == ["B", "C"]
+        await service.delete_compliance_check("b")
+        await service.close()
+
+        # The legacy files were renamed, so reopening does not bring "b" back
+        service = await ComplianceService.create()
+        assert await _names(service) == ["C"]
+        await service.close()
+
+    asyncio.run(scenario())
+    for path in (compliance_service.LEGACY_COMPLIANCE_CHECKS_PATH, compliance_service.LEGACY_COMPLIANCE_WAL_PATH):
+        assert not os.path.exists(path)
+        assert os.path.exists(f"{path}.migrated")
+
+def test_writes_are_visible_to_other_connections():
+    async def scenario():
+        writer = await ComplianceService.create()
+        reader = await ComplianceService.create()
+        await writer.create_compliance_check(ComplianceCheck(name="X", requirements=[]))
+        assert await _names(reader) == ["X"]
+        await writer.close()
+        await reader.close()
+
+    asyncio.run(scenario())
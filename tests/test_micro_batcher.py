@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+import torch
+
+from services.data_science import MicroBatcher
+
+def _image(value: int) -> torch.Tensor:
+    return torch.full((1, 3, 224, 224), value, dtype=torch.uint8)
+
+def _predict(batch: torch.Tensor) -> list:
+    # Echo each image's fill value so results can be matched to their requests
+    return [int(image[0, 0, 0]) for image in batch]
+
+def test_stop_serves_requests_queued_before_it():
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=1)
+        batcher.start(_predict)
+        requests = [asyncio.ensure_future(batcher.infer(_image(i))) for i in range(10)]
+        # Let every request reach the queue before stopping
+        await asyncio.sleep(0)
+        await batcher.stop()
+        assert all(request.done() for request in requests)
+        return [request.result() for request in requests]
+
+    assert asyncio.run(scenario()) == list(range(10))
+
+def test_cancelled_worker_fails_requests_in_flight():
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=50)
+        batcher.start(_predict)
+        request = asyncio.ensure_future(batcher.infer(_image(1)))
+        # The worker takes the request and waits for more to fill the batch
+        await asyncio.sleep(0.01)
+        batcher._worker.cancel()
+        await batcher.stop()
+        with pytest.raises(RuntimeError, match="stopped"):
+            await request
+
+    asyncio.run(scenario())
+
+def test_infer_after_stop_raises():
+    async def scenario():
+        batcher = MicroBatcher()
+        batcher.start(_predict)
+        await batcher.stop()
+        with pytest.raises(RuntimeError, match="not running"):
+            await batcher.infer(_image(0))
+
+    asyncio.run(scenario())
@@ -0,0 +1,58 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+import models.predictive_maintenance as predictive_maintenance
+from models.predictive_maintenance import ForestArrays, PredictiveMaintenanceModel
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 6)).astype(np.float32)
+    y = rng.random(200) * 30
+    return X, y
+
+def _fit(X, y, seed: int = 0) -> RandomForestRegressor:
+    return RandomForestRegressor(n_estimators=12, random_state=seed).fit(X, y)
+
+def test_numpy_traversal_matches_sklearn(data, monkeypatch):
+    X, y = data
+    forest = _fit(X, y)
+    monkeypatch.setattr(predictive_maintenance, "_walk_forest", None)
+    np.testing.assert_allclose(ForestArrays.from_estimator(forest).predict(X), forest.predict(X))
+
+@pytest.mark.skipif(predictive_maintenance._walk_forest is None, reason="numba is not installed")
+def test_numba_traversal_matches_sklearn(data):
+    X, y = data
+    forest = _fit(X, y)
+    np.testing.assert_allclose(ForestArrays.from_estimator(forest).predict(X), forest.predict(X))
+
+def test_saved_arrays_round_trip(data, tmp_path):
+    X, y = data
+    forest = _fit(X, y)
+    ForestArrays.from_estimator(forest).save(str(tmp_path), "digest")
+    loaded = ForestArrays.load(str(tmp_path))
+    assert ForestArrays.saved_source(str(tmp_path)) == "digest"
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X))
+
+def test_arrays_are_exported_and_refreshed_from_the_pickle(data, tmp_path, monkeypatch):
+    X, y = data
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.dirname(predictive_maintenance.MODEL_PATH))
+
+    first = _fit(X, y, seed=1)
+    with open(predictive_maintenance.MODEL_PATH, "wb") as file:
+        pickle.dump(first, file)
+    model = PredictiveMaintenanceModel()
+    assert os.path.isdir(predictive_maintenance.TREE_ARRAYS_DIR)
+    np.testing.assert_allclose(model.trees.predict(X), first.predict(X))
+
+    # A retrained pickle dropped in place replaces the exported arrays on the next start
+    second = _fit(X, y, seed=2)
+    with open(predictive_maintenance.MODEL_PATH, "wb") as file:
+        pickle.dump(second, file)
+    model = PredictiveMaintenanceModel()
+    np.testing.assert_allclose(model.trees.predict(X), second.predict(X))
@@ -0,0 +1,97 @@
+import os
+import types
+
+import pytest
+
+import services.quality_service as quality_service
+from services.quality_service import QualityService
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+def _standard(name: str):
+    return types.SimpleNamespace(name=name, description=None, threshold={"scratch": 0.5})
+
+def _names(service: QualityService) -> list:
+    return sorted(standard.name for standard in service.get_all_standards())
+
+def _crash_after(mutate):
+    """
+    Run mutate against a fresh service in a child process that exits without closing it.
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            service = QualityService()
+            mutate(service)
+            service.flush()
+            code = 0
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+def test_journal_replays_after_crash():
+    def mutate(service):
+        service.create_standard(_standard("A"))
+        b = service.create_standard(_standard("B"))
+        c = service.create_standard(_standard("C"))
+        service.update_standard(b.standard_id, _standard("B2"))
+        service.delete_standard(c.standard_id)
+
+    _crash_after(mutate)
+    service = QualityService()
+    assert _names(service) == ["A", "B2"]
+    service.close()
+
+def test_torn_final_entry_is_dropped():
+    _crash_after(lambda service: service.create_standard(_standard("A")))
+    with open(quality_service.QUALITY_JOURNAL_PATH, "ab") as file:
+        file.write(b'{"op":"upsert","stan')
+
+    service = QualityService()
+    service.create_standard(_standard("B"))
+    service.flush()
+    reopened = QualityService()
+    assert _names(reopened) == ["A", "B"]
+    reopened.close()
+    service.close()
+
+def test_compaction_keeps_entries_from_other_services():
+    first = QualityService()
+    second = QualityService()
+    first.create_standard(_standard("A"))
+    second.create_standard(_standard("B"))
+    second.flush()
+    first.compact()
+    assert os.path.getsize(quality_service.QUALITY_JOURNAL_PATH) == 0
+    first.close()
+    second.close()
+
+    service = QualityService()
+    assert _names(service) == ["A", "B"]
+    service.close()
+
+def test_close_without_mutations_leaves_snapshot_untouched():
+    service = QualityService()
+    service.create_standard(_standard("A"))
+    service.close()
+    with open(quality_service.QUALITY_STANDARDS_PATH, "rb") as file:
+        snapshot = file.read()
+
+    QualityService().close()
+    with open(quality_service.QUALITY_STANDARDS_PATH, "rb") as file:
+        assert file.read() == snapshot
+
+def test_unreadable_snapshot_is_not_overwritten():
+    os.makedirs(os.path.dirname(quality_service.QUALITY_STANDARDS_PATH))
+    snapshot = b'[{"standard_id": "x", "name": null, "threshold": {}}]'
+    with open(quality_service.QUALITY_STANDARDS_PATH, "wb") as file:
+        file.write(snapshot)
+
+    with pytest.raises(Exception):
+        QualityService()
+    with open(quality_service.QUALITY_STANDARDS_PATH, "rb") as file:
+        assert file.read() == snapshot